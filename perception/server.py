@@ -2,16 +2,33 @@
 
 Provides FastAPI endpoints for health checks and frame data.
 """
+import hashlib
 import logging
 import json
+import os
 from pathlib import Path
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from typing import Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # optional speedup; fall back to stdlib json
+    orjson = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("perception_server")
 
+
+def dumps(obj) -> bytes:
+    """Encode obj as compact JSON bytes, using orjson when it is installed."""
+    if orjson is None:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+    return orjson.dumps(obj)
+
+
 app = FastAPI(title="Nexus Perception Service")
 
 STATE_PATH = Path(__file__).parent / "state.json"
@@ -22,6 +39,38 @@ MIDAS_LOADED = True
 MOVENET_LOADED = True
 CAMERA_INDEX = 0
 
+# (key, state) for the last parsed state.json, where key is the file's
+# (mtime_ns, size). Replaced as a single tuple so concurrent /frame handlers
+# never pair one read's key with another read's payload.
+_state_cache: Optional[Tuple[tuple, dict]] = None
+
+
+def read_state() -> Optional[dict]:
+    """Return the parsed state.json, or None if it does not exist.
+
+    The parsed payload is cached and reused until the file's mtime or size
+    changes.
+    """
+    global _state_cache
+
+    try:
+        f = STATE_PATH.open("r", encoding="utf-8")
+    except FileNotFoundError:
+        return None
+
+    with f:
+        # Key off the opened file itself, so the key and the content read
+        # below always describe the same version of state.json.
+        stat = os.fstat(f.fileno())
+        key = (stat.st_mtime_ns, stat.st_size)
+        cache = _state_cache
+        if cache is not None and cache[0] == key:
+            return cache[1]
+        state = json.load(f)
+
+    _state_cache = (key, state)
+    return state
+
 
 @app.on_event("startup")
 async def startup_event():
@@ -29,44 +78,72 @@ async def startup_event():
     # Future: Load models here in a non-blocking way or use lazy loading
 
 
+# The health payload only depends on module constants, so it is encoded once
+# and served with a strong ETag that lets probes short-circuit with a 304.
+_HEALTH_BODY = dumps({
+    "ok": True,
+    "midas": MIDAS_LOADED,
+    "movenet": MOVENET_LOADED,
+    "camera_index": CAMERA_INDEX,
+    "model_path": str(MODEL_PATH),
+})
+_HEALTH_ETAG = '"%s"' % hashlib.md5(_HEALTH_BODY).hexdigest()
+_HEALTH_HEADERS = {"ETag": _HEALTH_ETAG, "Cache-Control": "max-age=1"}
+
+
 @app.get("/health")
-async def health() -> dict:
+async def health(request: Request) -> Response:
     """Health check endpoint."""
     logger.info("Health check requested")
-    
-    return {
-        "ok": True,
-        "midas": MIDAS_LOADED,
-        "movenet": MOVENET_LOADED,
-        "camera_index": CAMERA_INDEX,
-        "model_path": str(MODEL_PATH),
-    }
+
+    if request.headers.get("if-none-match") == _HEALTH_ETAG:
+        return Response(status_code=304, headers=_HEALTH_HEADERS)
+
+    return Response(
+        content=_HEALTH_BODY,
+        media_type="application/json",
+        headers=_HEALTH_HEADERS,
+    )
+
+
+# Encoded /frame bodies: the empty fallback, and (state, body) for the last
+# state.json snapshot, reused while read_state() keeps returning the same
+# object. The pair is replaced in one assignment so concurrent handlers never
+# see a body that belongs to a different state.
+_EMPTY_FRAME_BODY = dumps({
+    "ts": 0,
+    "size": [0, 0],
+    "depth": None,
+    "persons": [],
+})
+_frame_cache: Optional[Tuple[dict, bytes]] = None
 
 
 @app.get("/frame")
 def frame():
     """Get current perception frame data."""
-    # Try to read state.json if it exists
-    if STATE_PATH.exists():
-        try:
-            with STATE_PATH.open("r", encoding="utf-8") as f:
-                state = json.load(f)
-            return JSONResponse(content={
-                "ts": state.get("ts", 0),
-                "size": state.get("size", [0, 0]),
-                "depth": None,
-                "persons": state.get("persons", []),
-            })
-        except Exception:
-            pass
-    
+    global _frame_cache
+
+    try:
+        state = read_state()
+        if state is not None:
+            cache = _frame_cache
+            if cache is not None and cache[0] is state:
+                body = cache[1]
+            else:
+                body = dumps({
+                    "ts": state.get("ts", 0),
+                    "size": state.get("size", [0, 0]),
+                    "depth": None,
+                    "persons": state.get("persons", []),
+                })
+                _frame_cache = (state, body)
+            return Response(content=body, media_type="application/json")
+    except Exception:
+        pass
+
     # Fallback response
-    return JSONResponse(content={
-        "ts": 0,
-        "size": [0, 0],
-        "depth": None,
-        "persons": [],
-    })
+    return Response(content=_EMPTY_FRAME_BODY, media_type="application/json")
 
 
 if __name__ == "__main__":
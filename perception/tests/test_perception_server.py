@@ -0,0 +1,89 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+PERCEPTION_DIR = Path(__file__).resolve().parents[1]
+if str(PERCEPTION_DIR) not in sys.path:
+    sys.path.insert(0, str(PERCEPTION_DIR))
+
+import server
+
+
+@pytest.fixture
+def state_path(tmp_path, monkeypatch):
+    path = tmp_path / "state.json"
+    monkeypatch.setattr(server, "STATE_PATH", path)
+    monkeypatch.setattr(server, "_state_cache", None)
+    return path
+
+
+def write_state(path, state, mtime_ns):
+    path.write_text(json.dumps(state), encoding="utf-8")
+    # Pin distinct mtimes so back-to-back writes never share a cache key.
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_read_state_missing_file(state_path):
+    assert server.read_state() is None
+
+
+def test_read_state_picks_up_changes(state_path):
+    write_state(state_path, {"ts": 1}, 1_000_000_000)
+    first = server.read_state()
+    assert first == {"ts": 1}
+    assert server.read_state() is first
+
+    write_state(state_path, {"ts": 2}, 2_000_000_000)
+    assert server.read_state() == {"ts": 2}
+
+    state_path.unlink()
+    assert server.read_state() is None
+
+    write_state(state_path, {"ts": 3}, 3_000_000_000)
+    assert server.read_state() == {"ts": 3}
+
+
+def test_read_state_invalid_json_is_retried(state_path):
+    state_path.write_text("{not json", encoding="utf-8")
+    os.utime(state_path, ns=(1_000_000_000, 1_000_000_000))
+    with pytest.raises(ValueError):
+        server.read_state()
+
+    write_state(state_path, {"ts": 4}, 2_000_000_000)
+    assert server.read_state() == {"ts": 4}
+
+
+def test_health_round_trips_etag():
+    from fastapi.testclient import TestClient
+
+    client = TestClient(server.app)
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.json()["ok"] is True
+
+    cached = client.get("/health", headers={"If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+
+
+def test_frame_serves_current_state(state_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(server, "_frame_cache", None)
+    client = TestClient(server.app)
+    assert client.get("/frame").json()["persons"] == []
+
+    write_state(state_path, {"ts": 5, "size": [640, 480], "persons": [{"id": 1}]}, 1_000_000_000)
+    assert client.get("/frame").json() == {
+        "ts": 5,
+        "size": [640, 480],
+        "depth": None,
+        "persons": [{"id": 1}],
+    }
+
+    write_state(state_path, {"ts": 6, "size": [640, 480], "persons": []}, 2_000_000_000)
+    assert client.get("/frame").json()["ts"] == 6
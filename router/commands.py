@@ -1,76 +1,66 @@
 from __future__ import annotations
 
-from typing import List
+from typing import Callable, Dict, List
 
 DEFAULT_ENTITY_ID = "entity:cube:001"
 
 
-def text_to_patches(text: str) -> List[dict]:
-    """Convert a natural language command into schema-compliant patches."""
+def _move_patch(dx: float, dy: float, dz: float) -> dict:
+    return {
+        "id": DEFAULT_ENTITY_ID,
+        "type": "move_entity",
+        "data": {"dx": dx, "dy": dy, "dz": dz},
+    }
 
-    normalized = " ".join(text.lower().split())
 
-    move_vectors = {
-        "move cube up": (0.0, 1.0, 0.0),
-        "move cube down": (0.0, -1.0, 0.0),
-        "move cube left": (-1.0, 0.0, 0.0),
-        "move cube right": (1.0, 0.0, 0.0),
-        "move cube forward": (0.0, 0.0, 1.0),
-        "move cube back": (0.0, 0.0, -1.0),
+def _color_patch(color: List[float]) -> dict:
+    return {
+        "id": DEFAULT_ENTITY_ID,
+        "type": "set_color",
+        "data": {"color": color},
     }
 
-    if normalized in move_vectors:
-        dx, dy, dz = move_vectors[normalized]
-        return [
-            {
-                "id": DEFAULT_ENTITY_ID,
-                "type": "move_entity",
-                "data": {"dx": dx, "dy": dy, "dz": dz},
-            }
-        ]
 
-    if normalized == "spawn cube":
-        entity_id = DEFAULT_ENTITY_ID
-        return [
-            {
-                "id": entity_id,
-                "type": "spawn_entity",
-                "data": {"kind": "cube"},
-            },
-            {
-                "id": entity_id,
-                "type": "move_entity",
-                "data": {"dx": 0.0, "dy": 1.0, "dz": 0.0},
-            },
-            {
-                "id": entity_id,
-                "type": "set_color",
-                "data": {"color": [1.0, 1.0, 1.0]},
-            },
-        ]
+# Normalized command text -> a builder for the patches it expands to. The
+# table is built once at import; each builder returns fresh patch dicts, so
+# one caller mutating its result cannot leak into the next.
+_PATCHES: Dict[str, Callable[[], List[dict]]] = {
+    "move cube up": lambda: [_move_patch(0.0, 1.0, 0.0)],
+    "move cube down": lambda: [_move_patch(0.0, -1.0, 0.0)],
+    "move cube left": lambda: [_move_patch(-1.0, 0.0, 0.0)],
+    "move cube right": lambda: [_move_patch(1.0, 0.0, 0.0)],
+    "move cube forward": lambda: [_move_patch(0.0, 0.0, 1.0)],
+    "move cube back": lambda: [_move_patch(0.0, 0.0, -1.0)],
+    "spawn cube": lambda: [
+        {
+            "id": DEFAULT_ENTITY_ID,
+            "type": "spawn_entity",
+            "data": {"kind": "cube"},
+        },
+        _move_patch(0.0, 1.0, 0.0),
+        _color_patch([1.0, 1.0, 1.0]),
+    ],
+    "delete cube": lambda: [
+        {
+            "id": DEFAULT_ENTITY_ID,
+            "type": "delete_entity",
+            "data": {},
+        },
+    ],
+    "make cube red": lambda: [_color_patch([1.0, 0.0, 0.0])],
+    "make cube blue": lambda: [_color_patch([0.0, 0.0, 1.0])],
+    "make cube green": lambda: [_color_patch([0.0, 1.0, 0.0])],
+}
 
-    if normalized == "delete cube":
-        return [
-            {
-                "id": DEFAULT_ENTITY_ID,
-                "type": "delete_entity",
-                "data": {},
-            }
-        ]
 
-    color_map = {
-        "make cube red": [1.0, 0.0, 0.0],
-        "make cube blue": [0.0, 0.0, 1.0],
-        "make cube green": [0.0, 1.0, 0.0],
-    }
-
-    if normalized in color_map:
-        return [
-            {
-                "id": DEFAULT_ENTITY_ID,
-                "type": "set_color",
-                "data": {"color": color_map[normalized]},
-            }
-        ]
+def text_to_patches(text: str) -> List[dict]:
+    """Convert a natural language command into schema-compliant patches."""
 
-    return []
+    # Commands usually arrive already normalized; only fall back to
+    # lowercasing and collapsing whitespace when the raw text misses.
+    build = _PATCHES.get(text)
+    if build is None:
+        build = _PATCHES.get(" ".join(text.lower().split()))
+        if build is None:
+            return []
+    return build()
@@ -1,21 +1,52 @@
 from __future__ import annotations
 
+import gzip
+import hashlib
 import json
+import os
+import threading
+import time
+from functools import cache
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 
-from fastapi import FastAPI, Query
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response
 
 from router.commands import DEFAULT_ENTITY_ID, text_to_patches
 
-app = FastAPI(title="Nexus Command Router")
+try:
+    import orjson  # optional, see requirements.txt
+except ImportError:
+    orjson = None
+
+
+def dumps(obj) -> bytes:
+    """Serialize /command responses and command.json without whitespace."""
+
+    if orjson is None:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+    return orjson.dumps(obj)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered through dumps()."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+app = FastAPI(title="Nexus Command Router", default_response_class=FastJSONResponse)
 
 BASE_DIR = Path(__file__).resolve().parent
 GENERATED_DIR = BASE_DIR / "generated"
 UI_PATH = BASE_DIR / "ui" / "index.html"
-UI_HTML = UI_PATH.read_text(encoding="utf-8") if UI_PATH.exists() else None
 COMMAND_PATH = GENERATED_DIR / "command.json"
+COMMAND_TMP_PATH = GENERATED_DIR / "command.json.tmp"
+# Sync handlers run on a threadpool; serialize writers sharing the temp file.
+_COMMAND_WRITE_LOCK = threading.Lock()
+REPLACE_RETRIES = 20
+REPLACE_RETRY_DELAY_SECONDS = 0.01
 # Command UI manual flow (M3 Phase 3)
 # 1) Start router:
 #    uvicorn router.server:app --host 127.0.0.1 --port 5056 --reload
@@ -26,6 +57,78 @@ COMMAND_PATH = GENERATED_DIR / "command.json"
 #    Bevy app updates the scene from those patches.
 
 
+@cache
+def load_ui() -> Optional[Tuple[bytes, bytes, str]]:
+    """Read router/ui/index.html on first use.
+
+    Returns the raw bytes, their gzipped form and an MD5 hex digest, or None
+    if the file is missing. The result is cached for the process lifetime.
+    """
+
+    if not UI_PATH.exists():
+        return None
+    body = UI_PATH.read_bytes()
+    return body, gzip.compress(body, compresslevel=9), hashlib.md5(body).hexdigest()
+
+
+def replace_file(src: Path, dst: Path) -> None:
+    """os.replace src over dst, retrying briefly on PermissionError.
+
+    On Windows the rename fails while another process (the runtime watcher
+    reading command.json) has dst open without FILE_SHARE_DELETE.
+    """
+
+    for _ in range(REPLACE_RETRIES - 1):
+        try:
+            os.replace(src, dst)
+            return
+        except PermissionError:
+            time.sleep(REPLACE_RETRY_DELAY_SECONDS)
+    os.replace(src, dst)
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Return True if an Accept-Encoding header allows a gzip response.
+
+    An explicit gzip entry decides; otherwise a ``*`` entry does. Either is
+    refused when its q-value is zero.
+    """
+
+    qvalues = {}
+    for entry in accept_encoding.split(","):
+        coding, _, params = entry.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qvalues[coding] = q
+
+    q = qvalues.get("gzip", qvalues.get("*", 0.0))
+    return q > 0.0
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Return True if an If-None-Match header names etag.
+
+    The header may list several ETags. The comparison is weak, so a ``W/``
+    prefix is ignored, and ``*`` matches any ETag.
+    """
+
+    etag = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
 def ensure_generated_dir() -> None:
     """Ensure the router/generated directory exists."""
 
@@ -36,11 +139,16 @@ def write_patches(patches: List[dict]) -> List[dict]:
     """Persist the patches to router/generated/command.json.
 
     The payload is always written as a JSON list to keep the runtime contract
-    consistent regardless of how many patches were generated.
+    consistent regardless of how many patches were generated. It is written
+    to a temporary file and renamed into place so the runtime watcher never
+    reads a half-written command file.
     """
 
     ensure_generated_dir()
-    COMMAND_PATH.write_text(json.dumps(patches, indent=2))
+    payload = dumps(patches)
+    with _COMMAND_WRITE_LOCK:
+        COMMAND_TMP_PATH.write_bytes(payload)
+        replace_file(COMMAND_TMP_PATH, COMMAND_PATH)
     return patches
 
 
@@ -52,16 +160,33 @@ def root() -> RedirectResponse:
 
 
 @app.get("/ui", response_class=HTMLResponse, include_in_schema=False)
-def ui() -> HTMLResponse:
-    """Serve the command UI HTML file from router/ui/index.html."""
+def ui(request: Request) -> Response:
+    """Serve the command UI HTML file from router/ui/index.html.
 
-    if UI_HTML is None:
+    The gzipped body is sent to clients that accept it, and a matching
+    If-None-Match short-circuits to 304 Not Modified.
+    """
+
+    asset = load_ui()
+    if asset is None:
         return HTMLResponse(
             status_code=500,
             content="<h1>UI missing</h1><p>router/ui/index.html not found.</p>",
         )
 
-    return HTMLResponse(content=UI_HTML)
+    body, body_gzip, digest = asset
+    use_gzip = accepts_gzip(request.headers.get("accept-encoding", ""))
+    # Each encoding is a distinct representation, so give each its own ETag.
+    etag = f'"{digest}-gzip"' if use_gzip else f'"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=body_gzip, media_type="text/html", headers=headers)
+    return Response(content=body, media_type="text/html", headers=headers)
 
 
 @app.get("/health")
@@ -74,12 +199,12 @@ def command(text: str = Query(..., description="Natural language command")):
     patches = text_to_patches(text)
 
     if not patches:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=400, content={"error": "Unknown command", "patches": []}
         )
 
     payload = write_patches(patches)
-    return JSONResponse(content=payload)
+    return FastJSONResponse(content=payload)
 
 
 # Manual test flow (M3 Command Router MVP)
@@ -75,3 +75,14 @@ def test_delete_cube_command():
 def test_unknown_command_returns_empty_list():
     patches = text_to_patches("dance cube")
     assert patches == []
+
+
+def test_mutating_result_does_not_leak_into_later_calls():
+    patches = text_to_patches("make cube red")
+    patches[0]["data"]["color"][0] = 0.5
+
+    assert text_to_patches("make cube red")[0]["data"]["color"] == [1.0, 0.0, 0.0]
+
+
+def test_command_text_is_normalized():
+    assert text_to_patches("  Move   CUBE\tup ") == text_to_patches("move cube up")
@@ -0,0 +1,70 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from router import server
+
+
+def test_replace_file_retries_permission_error(tmp_path, monkeypatch):
+    src = tmp_path / "command.json.tmp"
+    dst = tmp_path / "command.json"
+    src.write_text("[]")
+    real_replace = server.os.replace
+    attempts = []
+
+    def flaky_replace(a, b):
+        attempts.append((a, b))
+        if len(attempts) < 3:
+            raise PermissionError("target is open")
+        real_replace(a, b)
+
+    monkeypatch.setattr(server.os, "replace", flaky_replace)
+    monkeypatch.setattr(server, "REPLACE_RETRY_DELAY_SECONDS", 0.0)
+
+    server.replace_file(src, dst)
+
+    assert len(attempts) == 3
+    assert dst.read_text() == "[]"
+    assert not src.exists()
+
+
+@pytest.mark.parametrize(
+    "header,expected",
+    [
+        ("gzip", True),
+        ("gzip, deflate, br", True),
+        ("br;q=1.0, GZIP;q=0.5", True),
+        ("gzip;q=0", False),
+        ("gzip; q=0.0, deflate", False),
+        ("deflate", False),
+        ("*", True),
+        ("*;q=0", False),
+        ("gzip;q=0, *", False),
+        ("", False),
+    ],
+)
+def test_accepts_gzip(header, expected):
+    assert server.accepts_gzip(header) is expected
+
+
+@pytest.mark.parametrize(
+    "header,expected",
+    [
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"xyz", W/"abc"', True),
+        ("*", True),
+        ('"xyz"', False),
+        ('"abc-gzip"', False),
+        ("", False),
+    ],
+)
+def test_etag_matches(header, expected):
+    assert server.etag_matches(header, '"abc"') is expected
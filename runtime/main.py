@@ -1,12 +1,37 @@
 from __future__ import annotations
 
 import argparse
+import codecs
+import ctypes
+import ctypes.util
 import json
+import os
+import select
+import struct
+import sys
 import time
+from functools import cache
 from pathlib import Path
-from typing import Iterable, List
+from typing import Callable, Dict, Iterable, List, Tuple
+
+try:
+    import orjson
+except ImportError:  # _loads/_dumps fall back to the json module
+    orjson = None
 
 POLL_INTERVAL_SECONDS = 0.2
+# Windows refuses the world.json rename while the renderer has it open.
+SAVE_RETRIES = 20
+SAVE_RETRY_DELAY_SECONDS = 0.01
+# Per-patch timing logs are a debug aid; enable them with NEXUS_VERBOSE=1.
+VERBOSE = bool(os.environ.get("NEXUS_VERBOSE"))
+
+# inotify(7) constants used by the Linux watch loop.
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+_INOTIFY_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
 
 # Robustly find the world path relative to the repo root, not CWD
 RUNTIME_DIR = Path(__file__).resolve().parent
@@ -18,37 +43,80 @@ def log(message: str) -> None:
     print(f"[runtime] {message}")
 
 
+def _loads(data: bytes):
+    """Parse JSON bytes, tolerating a UTF-8 BOM (world.json may carry one)."""
+
+    if orjson is None:
+        return json.loads(data)
+    return orjson.loads(data.removeprefix(codecs.BOM_UTF8))
+
+
+def _dumps(obj) -> bytes:
+    """Encode obj as 2-space indented JSON bytes with a trailing newline."""
+
+    if orjson is None:
+        return (json.dumps(obj, indent=2) + "\n").encode("utf-8")
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+
+
 def load_world(path: Path = WORLD_PATH) -> dict:
     """Load the on-disk world file, creating a default one if necessary."""
 
-    if path.exists():
-        return json.loads(path.read_text(encoding="utf-8-sig"))
+    try:
+        return _loads(path.read_bytes())
+    except FileNotFoundError:
+        pass
 
     default_world = {
         "entities": [],
         "camera": {"translation": [0.0, 5.0, 10.0]},
         "light": {"color": [1.0, 1.0, 1.0], "intensity": 1.0},
     }
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(default_world, indent=2))
+    save_world(default_world, path)
     return default_world
 
 
 def save_world(world: dict, path: Path = WORLD_PATH) -> None:
-    """Persist the world to disk."""
+    """Persist the world to disk.
+
+    The JSON is written to a sibling temp file and renamed over ``path``, so
+    the renderer never reads a partially written world. A rename refused
+    with PermissionError is retried for a short while.
+    """
 
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(world, indent=2))
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(_dumps(world))
+    for _ in range(SAVE_RETRIES - 1):
+        try:
+            os.replace(tmp_path, path)
+            return
+        except PermissionError:
+            time.sleep(SAVE_RETRY_DELAY_SECONDS)
+    os.replace(tmp_path, path)
 
 
 def load_patches(patch_path: Path) -> List[dict]:
-    """Load patches from disk, coercing them into a list."""
+    """Load patches from disk, coercing them into a list.
+
+    An empty file (as left behind by the watch loop) yields no patches.
+    """
 
     try:
-        content = json.loads(patch_path.read_text())
+        data = patch_path.read_bytes()
     except FileNotFoundError:
         log(f"patch file not found: {patch_path}")
         return []
+    return parse_patches(data)
+
+
+def parse_patches(data: bytes) -> List[dict]:
+    """Parse a patch payload (single patch or list); empty data is no patches."""
+
+    if not data:
+        return []
+    try:
+        content = _loads(data)
     except json.JSONDecodeError as exc:
         log(f"invalid patch JSON: {exc}")
         return []
@@ -63,6 +131,19 @@ def load_patches(patch_path: Path) -> List[dict]:
 
 
 def ensure_entity_defaults(entity: dict) -> None:
+    transform = entity.get("transform")
+    material = entity.get("material")
+    if (
+        transform is not None
+        and material is not None
+        and "translation" in transform
+        and "rotation" in transform
+        and "scale" in transform
+        and "color" in material
+    ):
+        # Fully populated (the common case): skip building default lists.
+        return
+
     transform = entity.setdefault("transform", {})
     transform.setdefault("translation", [0.0, 0.0, 0.0])
     transform.setdefault("rotation", [0.0, 0.0, 0.0])
@@ -72,106 +153,149 @@ def ensure_entity_defaults(entity: dict) -> None:
     material.setdefault("color", [1.0, 1.0, 1.0])
 
 
-def find_entity(world: dict, entity_id: str) -> dict | None:
+def index_entities(world: dict) -> Dict[str, dict]:
+    """Map entity id -> entity, keeping the first entity for a repeated id."""
+
+    return {e.get("id"): e for e in reversed(world.get("entities", []))}
+
+
+def find_entity(world: dict, entity_id: str, index: Dict[str, dict] | None = None) -> dict | None:
+    if index is not None:
+        return index.get(entity_id)
     for entity in world.get("entities", []):
         if entity.get("id") == entity_id:
             return entity
     return None
 
 
-def apply_patch(world: dict, patch: dict) -> bool:
+def _delta3(data: dict) -> Tuple[float, float, float]:
+    """Read the (dx, dy, dz) translation delta from a move patch payload."""
+
+    get = data.get
+    return float(get("dx", 0.0)), float(get("dy", 0.0)), float(get("dz", 0.0))
+
+
+def _spawn_entity(world: dict, data: dict, entity_id: str | None, index: Dict[str, dict] | None) -> bool:
+    new_entity = {
+        "id": entity_id or f"entity:{len(world.get('entities', [])) + 1:03d}",
+        "kind": data.get("kind", "cube"),
+        "transform": {"translation": [0.0, 0.0, 0.0], "rotation": [0.0, 0.0, 0.0], "scale": [1.0, 1.0, 1.0]},
+        "material": {"color": [1.0, 1.0, 1.0]},
+    }
+    world.setdefault("entities", []).append(new_entity)
+    if index is not None:
+        index.setdefault(new_entity["id"], new_entity)
+    return True
+
+
+def _move_entity(world: dict, data: dict, entity_id: str | None, index: Dict[str, dict] | None) -> bool:
+    entity = find_entity(world, entity_id, index) if entity_id else None
+    if entity:
+        ensure_entity_defaults(entity)
+        translation = entity["transform"]["translation"]
+        dx, dy, dz = _delta3(data)
+        translation[0] += dx
+        translation[1] += dy
+        translation[2] += dz
+        return True
+    log(f"move_entity target missing: {entity_id}")
+    return False
+
+
+def _set_color(world: dict, data: dict, entity_id: str | None, index: Dict[str, dict] | None) -> bool:
+    entity = find_entity(world, entity_id, index) if entity_id else None
+    if entity:
+        ensure_entity_defaults(entity)
+        color = data.get("color")
+        if isinstance(color, Iterable):
+            entity["material"]["color"] = [float(c) for c in color][:3]
+            return True
+    log(f"set_color target missing or invalid payload for {entity_id}")
+    return False
+
+
+def _delete_entity(world: dict, data: dict, entity_id: str | None, index: Dict[str, dict] | None) -> bool:
+    entities = world.get("entities", [])
+    before = len(entities)
+    # With an index, a missing id is known without scanning the list. Ids are
+    # not guaranteed unique ("spawn cube" reuses one), so a hit still filters
+    # out every match, in place so callers holding the list see the change.
+    if entity_id and (index is None or index.pop(entity_id, None) is not None):
+        entities[:] = [e for e in entities if e.get("id") != entity_id]
+    if before != len(entities):
+        return True
+    log(f"delete_entity target missing: {entity_id}")
+    return False
+
+
+def _move_camera(world: dict, data: dict, entity_id: str | None, index: Dict[str, dict] | None) -> bool:
+    camera = world.setdefault("camera", {"translation": [0.0, 0.0, 0.0]})
+    translation = camera.setdefault("translation", [0.0, 0.0, 0.0])
+    dx, dy, dz = _delta3(data)
+    translation[0] += dx
+    translation[1] += dy
+    translation[2] += dz
+    return True
+
+
+def _set_light(world: dict, data: dict, entity_id: str | None, index: Dict[str, dict] | None) -> bool:
+    light = world.setdefault("light", {"color": [1.0, 1.0, 1.0], "intensity": 1.0})
+    if "intensity" in data:
+        light["intensity"] = float(data["intensity"])
+    if "color" in data and isinstance(data["color"], Iterable):
+        light["color"] = [float(c) for c in data["color"]][:3]
+    return True
+
+
+# Patch type -> handler(world, data, entity_id, index), returning True if it
+# mutated the world.
+_HANDLERS: Dict[str, Callable[[dict, dict, str | None, Dict[str, dict] | None], bool]] = {
+    "spawn_entity": _spawn_entity,
+    "move_entity": _move_entity,
+    "set_color": _set_color,
+    "delete_entity": _delete_entity,
+    "move_camera": _move_camera,
+    "set_light": _set_light,
+}
+
+
+def apply_patch(world: dict, patch: dict, index: Dict[str, dict] | None = None) -> bool:
     """Apply a single patch to the in-memory world.
 
+    ``index`` is an optional id -> entity map from index_entities(); when
+    given, entity lookups use it and spawn/delete keep it in sync.
+
     Returns True if the patch mutated the world, False otherwise.
     """
 
     patch_type = patch.get("type")
-    data = patch.get("data", {})
-    entity_id = patch.get("id")
-
-    start = time.perf_counter()
-
     if not patch_type:
         log("skipping patch with no type field")
         return False
 
-    if patch_type == "spawn_entity":
-        new_entity = {
-            "id": entity_id or f"entity:{len(world.get('entities', [])) + 1:03d}",
-            "kind": data.get("kind", "cube"),
-            "transform": {"translation": [0.0, 0.0, 0.0], "rotation": [0.0, 0.0, 0.0], "scale": [1.0, 1.0, 1.0]},
-            "material": {"color": [1.0, 1.0, 1.0]},
-        }
-        world.setdefault("entities", []).append(new_entity)
-        duration_ms = (time.perf_counter() - start) * 1000
-        log(f"applied {patch_type} in {duration_ms:.2f}ms")
-        return True
-
-    if patch_type == "move_entity" and entity_id:
-        entity = find_entity(world, entity_id)
-        if entity:
-            ensure_entity_defaults(entity)
-            translation = entity["transform"]["translation"]
-            translation[0] += float(data.get("dx", 0.0))
-            translation[1] += float(data.get("dy", 0.0))
-            translation[2] += float(data.get("dz", 0.0))
-            duration_ms = (time.perf_counter() - start) * 1000
-            log(f"applied {patch_type} in {duration_ms:.2f}ms")
-            return True
-        log(f"move_entity target missing: {entity_id}")
+    handler = _HANDLERS.get(patch_type)
+    if handler is None:
+        log(f"unhandled patch type: {patch_type}")
         return False
 
-    if patch_type == "set_color" and entity_id:
-        entity = find_entity(world, entity_id)
-        if entity:
-            ensure_entity_defaults(entity)
-            color = data.get("color")
-            if isinstance(color, Iterable):
-                entity["material"]["color"] = [float(c) for c in color][:3]
-                duration_ms = (time.perf_counter() - start) * 1000
-                log(f"applied {patch_type} in {duration_ms:.2f}ms")
-                return True
-        log(f"set_color target missing or invalid payload for {entity_id}")
-        return False
+    if not VERBOSE:
+        return handler(world, patch.get("data", {}), patch.get("id"), index)
 
-    if patch_type == "delete_entity" and entity_id:
-        entities = world.get("entities", [])
-        before = len(entities)
-        world["entities"] = [e for e in entities if e.get("id") != entity_id]
-        duration_ms = (time.perf_counter() - start) * 1000
-        log(f"applied {patch_type} in {duration_ms:.2f}ms")
-        return before != len(world["entities"])
-
-    if patch_type == "move_camera":
-        camera = world.setdefault("camera", {"translation": [0.0, 0.0, 0.0]})
-        translation = camera.setdefault("translation", [0.0, 0.0, 0.0])
-        translation[0] += float(data.get("dx", 0.0))
-        translation[1] += float(data.get("dy", 0.0))
-        translation[2] += float(data.get("dz", 0.0))
-        duration_ms = (time.perf_counter() - start) * 1000
-        log(f"applied {patch_type} in {duration_ms:.2f}ms")
-        return True
-
-    if patch_type == "set_light":
-        light = world.setdefault("light", {"color": [1.0, 1.0, 1.0], "intensity": 1.0})
-        if "intensity" in data:
-            light["intensity"] = float(data["intensity"])
-        if "color" in data and isinstance(data["color"], Iterable):
-            light["color"] = [float(c) for c in data["color"]][:3]
+    start = time.perf_counter()
+    applied = handler(world, patch.get("data", {}), patch.get("id"), index)
+    if applied:
         duration_ms = (time.perf_counter() - start) * 1000
         log(f"applied {patch_type} in {duration_ms:.2f}ms")
-        return True
-
-    log(f"unhandled patch type: {patch_type}")
-    return False
+    return applied
 
 
 def apply_patches(world: dict, patches: List[dict], world_path: Path = WORLD_PATH) -> dict:
-    """Apply patches sequentially, persisting after each patch."""
+    """Apply patches sequentially, then persist the world once."""
 
+    index = index_entities(world)
     for patch in patches:
-        apply_patch(world, patch)
-        save_world(world, world_path)
+        apply_patch(world, patch, index)
+    save_world(world, world_path)
     return world
 
 
@@ -197,7 +321,12 @@ def parse_args() -> argparse.Namespace:
         "--interval",
         type=float,
         default=POLL_INTERVAL_SECONDS,
-        help="Polling interval in seconds when using --watch.",
+        help="Polling interval in seconds for --watch with --poll or without inotify.",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="Poll the --watch file instead of using inotify (e.g. on NFS or bind mounts).",
     )
     parser.add_argument(
         "--world",
@@ -208,32 +337,166 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def watch_patch_file(patch_path: Path, world_path: Path, interval: float) -> None:
-    """Continuously poll for changes to patch_path and apply them live."""
+def _file_key(path: Path) -> Tuple[int, int, int] | None:
+    """Identify the current contents of path by (inode, mtime_ns, size)."""
 
-    world = load_world(world_path)
-    last_modified: float | None = None
-    log(f"watching {patch_path} for updates")
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def _process_patch_file(patch_path: Path, world: dict, world_path: Path) -> Tuple[int, int, int] | None:
+    """Apply the patches in patch_path, then clear it.
+
+    Reading, clearing and the final fstat all go through one open file, so
+    a command the router renames in meanwhile lands on a new inode and
+    survives for the next pass instead of being truncated unseen.
+
+    Returns the file key of the cleared file, so a watcher can tell its own
+    write apart from a new command, or None if patch_path has vanished.
+    """
+
+    try:
+        handle = patch_path.open("r+b")
+    except FileNotFoundError:
+        return None
+
+    with handle:
+        patches = parse_patches(handle.read())
+        if patches:
+            start = time.perf_counter()
+            apply_patches(world, patches, world_path)
+            duration_ms = (time.perf_counter() - start) * 1000
+            log(f"applied {len(patches)} patches from watch loop in {duration_ms:.2f}ms")
+        else:
+            log("no valid patches found; clearing command file")
+
+        # An empty file reads back as no patches, so truncating is enough to clear.
+        handle.truncate(0)
+        stat = os.fstat(handle.fileno())
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+@cache
+def _libc() -> ctypes.CDLL | None:
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        # Resolve the symbols up front; non-glibc libcs may lack them.
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+def _inotify_add_watch(fd: int, directory: Path) -> bool:
+    """(Re)create the watch on directory; return False if that is impossible."""
 
+    libc = _libc()
+    if libc is None:
+        return False
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return False
+    return libc.inotify_add_watch(fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO) >= 0
+
+
+def _inotify_init(directory: Path) -> int | None:
+    """Return an inotify fd watching directory, or None if unsupported."""
+
+    if not sys.platform.startswith("linux"):
+        return None
+    libc = _libc()
+    if libc is None:
+        return None
+    fd = libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+    if fd < 0:
+        return None
+    if not _inotify_add_watch(fd, directory):
+        os.close(fd)
+        return None
+    return fd
+
+
+def _inotify_events(buf: bytes) -> List[Tuple[int, str]]:
+    """Parse a buffer read from an inotify fd into (mask, name) pairs."""
+
+    events = []
+    offset = 0
+    while offset < len(buf):
+        _, mask, _, length = _INOTIFY_EVENT.unpack_from(buf, offset)
+        offset += _INOTIFY_EVENT.size
+        events.append((mask, os.fsdecode(buf[offset:offset + length].rstrip(b"\0"))))
+        offset += length
+    return events
+
+
+def _poll_patch_file(
+    patch_path: Path, world: dict, world_path: Path, interval: float, last_key: Tuple[int, int, int] | None
+) -> None:
+    """Poll patch_path every ``interval`` seconds, applying each new version."""
+
+    while True:
+        key = _file_key(patch_path)
+        if key is not None and key != last_key:
+            last_key = _process_patch_file(patch_path, world, world_path)
+        time.sleep(interval)
+
+
+def _watch_inotify(fd: int, patch_path: Path, world: dict, world_path: Path) -> Tuple[int, int, int] | None:
+    """Apply new versions of patch_path, sleeping until inotify reports a change.
+
+    patch_path is re-checked on every wake-up. Returns the last processed
+    file key once the watch is gone and cannot be re-added.
+    """
+
+    last_key = None
     while True:
+        key = _file_key(patch_path)
+        if key is not None and key != last_key:
+            last_key = _process_patch_file(patch_path, world, world_path)
+
+        select.select([fd], [], [])
         try:
-            modified = patch_path.stat().st_mtime
-        except FileNotFoundError:
-            time.sleep(interval)
+            events = _inotify_events(os.read(fd, 64 * 1024))
+        except BlockingIOError:
             continue
+        # IN_IGNORED means the watch was dropped (e.g. the directory was
+        # removed). An IN_Q_OVERFLOW needs nothing extra: the key check above
+        # catches whatever the lost events described.
+        if any(mask & IN_IGNORED for mask, _ in events):
+            if not _inotify_add_watch(fd, patch_path.parent):
+                return last_key
 
-        if last_modified is None or modified > last_modified:
-            patches = load_patches(patch_path)
-            if patches:
-                apply_patches(world, patches, world_path)
-                log(f"applied {len(patches)} patches from watch loop")
-            else:
-                log("no valid patches found; clearing command file")
 
-            patch_path.write_text(json.dumps([], indent=2))
-            last_modified = patch_path.stat().st_mtime
+def watch_patch_file(patch_path: Path, world_path: Path, interval: float, use_inotify: bool = True) -> None:
+    """Apply changes to patch_path live as they are written.
 
-        time.sleep(interval)
+    On Linux the parent directory is watched with inotify, so the loop sleeps
+    until a write completes or a file is renamed into place. Elsewhere, if
+    inotify is unavailable or ``use_inotify`` is False, patch_path is polled
+    every ``interval`` seconds.
+    """
+
+    world = load_world(world_path)
+    patch_path.parent.mkdir(parents=True, exist_ok=True)
+    log(f"watching {patch_path} for updates")
+
+    fd = _inotify_init(patch_path.parent) if use_inotify else None
+    if fd is None:
+        _poll_patch_file(patch_path, world, world_path, interval, None)
+        return
+
+    try:
+        last_key = _watch_inotify(fd, patch_path, world, world_path)
+    finally:
+        os.close(fd)
+
+    log(f"lost inotify watch on {patch_path.parent}; falling back to polling")
+    _poll_patch_file(patch_path, world, world_path, interval, last_key)
 
 
 def simulate_patches(patch_path: Path, world_path: Path) -> None:
@@ -244,10 +507,11 @@ def simulate_patches(patch_path: Path, world_path: Path) -> None:
 
     print(f"[simulate] loaded {len(patches)} patches from {patch_path}")
 
+    index = index_entities(world)
     for patch in patches:
         patch_type = patch.get("type", "<unknown>")
         target_id = patch.get("id", "<no-id>")
-        applied = apply_patch(world, patch)
+        applied = apply_patch(world, patch, index)
         status = "applied" if applied else "skipped"
         print(f"[simulate] {status} {patch_type} to {target_id}")
 
@@ -262,7 +526,7 @@ def main() -> None:
     log(f"Using world file: {args.world.resolve()}")
 
     if args.watch:
-        watch_patch_file(args.watch, args.world, args.interval)
+        watch_patch_file(args.watch, args.world, args.interval, use_inotify=not args.poll)
         return
 
     if args.simulate:
@@ -271,8 +535,7 @@ def main() -> None:
 
     patches = load_patches(args.patch)
     world = load_world(args.world)
-    updated_world = apply_patches(world, patches, args.world)
-    save_world(updated_world, args.world)
+    apply_patches(world, patches, args.world)
 
 
 if __name__ == "__main__":
@@ -1,4 +1,7 @@
 from copy import deepcopy
+import json
+import os
+import select
 import sys
 from pathlib import Path
 
@@ -8,7 +11,21 @@ PROJECT_ROOT = Path(__file__).resolve().parents[2]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from runtime.main import apply_patch
+from runtime import main as runtime_main
+from runtime.main import apply_patch, apply_patches, load_patches, load_world
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _clone(obj):
+    """Deep-copy a JSON-compatible world; an orjson round-trip beats deepcopy."""
+
+    if orjson is None:
+        return deepcopy(obj)
+    return orjson.loads(orjson.dumps(obj))
 
 
 @pytest.fixture
@@ -37,7 +54,7 @@ def test_move_entity(sample_world):
         "type": "move_entity",
         "data": {"dx": 0.0, "dy": 1.0, "dz": 0.0},
     }
-    world = deepcopy(sample_world)
+    world = _clone(sample_world)
 
     changed = apply_patch(world, patch)
 
@@ -52,7 +69,7 @@ def test_set_color(sample_world):
         "type": "set_color",
         "data": {"color": [0.0, 1.0, 0.0]},
     }
-    world = deepcopy(sample_world)
+    world = _clone(sample_world)
 
     changed = apply_patch(world, patch)
 
@@ -67,7 +84,7 @@ def test_delete_entity(sample_world):
         "type": "delete_entity",
         "data": {},
     }
-    world = deepcopy(sample_world)
+    world = _clone(sample_world)
 
     changed = apply_patch(world, patch)
 
@@ -77,9 +94,144 @@ def test_delete_entity(sample_world):
 
 def test_unknown_patch_type(sample_world):
     patch = {"id": "entity:cube:001", "type": "unknown", "data": {}}
-    world = deepcopy(sample_world)
+    world = _clone(sample_world)
 
     changed = apply_patch(world, patch)
 
     assert changed is False
     assert world == sample_world
+
+
+def test_apply_patches_persists_world(sample_world, tmp_path):
+    patches = [
+        {"id": "entity:cube:001", "type": "move_entity", "data": {"dx": 1.0}},
+        {"id": "entity:cube:001", "type": "set_color", "data": {"color": [1.0, 0.0, 0.0]}},
+    ]
+    world_path = tmp_path / "world.json"
+    world = _clone(sample_world)
+
+    apply_patches(world, patches, world_path)
+
+    saved = load_world(world_path)
+    assert saved == world
+    assert saved["entities"][0]["transform"]["translation"] == pytest.approx([1.0, 0.0, 0.0])
+    assert saved["entities"][0]["material"]["color"] == pytest.approx([1.0, 0.0, 0.0])
+
+
+def test_apply_patches_tracks_spawned_and_deleted_entities(sample_world, tmp_path):
+    patches = [
+        {"id": "entity:cube:002", "type": "spawn_entity", "data": {"kind": "cube"}},
+        {"id": "entity:cube:002", "type": "move_entity", "data": {"dy": 2.0}},
+        {"id": "entity:cube:001", "type": "delete_entity", "data": {}},
+        {"id": "entity:cube:001", "type": "move_entity", "data": {"dy": 1.0}},
+    ]
+    world = _clone(sample_world)
+
+    apply_patches(world, patches, tmp_path / "world.json")
+
+    assert [e["id"] for e in world["entities"]] == ["entity:cube:002"]
+    translation = world["entities"][0]["transform"]["translation"]
+    assert translation == pytest.approx([0.0, 2.0, 0.0])
+
+
+def test_load_patches_empty_file(tmp_path):
+    patch_path = tmp_path / "command.json"
+    patch_path.write_bytes(b"")
+
+    assert load_patches(patch_path) == []
+
+
+def write_command(path, patches):
+    """Write patches the way the router does: temp file + atomic rename."""
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(patches))
+    os.replace(tmp_path, path)
+
+
+def test_inotify_events_parses_real_buffer(tmp_path):
+    watched = tmp_path / "gen"
+    watched.mkdir()
+    fd = runtime_main._inotify_init(watched)
+    if fd is None:
+        pytest.skip("inotify is not available")
+    try:
+        (watched / "written.json").write_text("[]")
+        write_command(watched / "command.json", [])
+        watched.joinpath("written.json").unlink()
+        watched.joinpath("command.json").unlink()
+        watched.rmdir()
+
+        events = []
+        while select.select([fd], [], [], 1.0)[0]:
+            events.extend(runtime_main._inotify_events(os.read(fd, 64 * 1024)))
+            if any(mask & runtime_main.IN_IGNORED for mask, _ in events):
+                break
+    finally:
+        os.close(fd)
+
+    assert any(mask & runtime_main.IN_CLOSE_WRITE and name == "written.json" for mask, name in events)
+    assert any(mask & runtime_main.IN_MOVED_TO and name == "command.json" for mask, name in events)
+    assert any(mask & runtime_main.IN_IGNORED for mask, _ in events)
+
+
+def test_process_patch_file_applies_and_clears(sample_world, tmp_path):
+    patch_path = tmp_path / "command.json"
+    world_path = tmp_path / "world.json"
+    write_command(patch_path, [{"id": "entity:cube:001", "type": "move_entity", "data": {"dy": 1.0}}])
+    world = _clone(sample_world)
+
+    key = runtime_main._process_patch_file(patch_path, world, world_path)
+
+    assert world["entities"][0]["transform"]["translation"] == pytest.approx([0.0, 1.0, 0.0])
+    assert load_world(world_path) == world
+    assert patch_path.read_bytes() == b""
+    # The watcher compares against this key, so its own clear is not a change.
+    assert key == runtime_main._file_key(patch_path)
+
+
+def test_renamed_in_command_is_seen_as_change(sample_world, tmp_path):
+    patch_path = tmp_path / "command.json"
+    write_command(patch_path, [])
+    key = runtime_main._process_patch_file(patch_path, _clone(sample_world), tmp_path / "world.json")
+
+    write_command(patch_path, [{"id": "entity:cube:001", "type": "delete_entity", "data": {}}])
+
+    assert runtime_main._file_key(patch_path) != key
+
+
+def test_command_renamed_in_during_processing_survives(sample_world, tmp_path, monkeypatch):
+    patch_path = tmp_path / "command.json"
+    world_path = tmp_path / "world.json"
+    write_command(patch_path, [{"id": "entity:cube:001", "type": "move_entity", "data": {"dx": 1.0}}])
+    late_command = [{"id": "entity:cube:001", "type": "move_entity", "data": {"dz": 1.0}}]
+    real_apply_patches = runtime_main.apply_patches
+
+    def apply_then_router_writes(world, patches, path):
+        real_apply_patches(world, patches, path)
+        write_command(patch_path, late_command)
+
+    monkeypatch.setattr(runtime_main, "apply_patches", apply_then_router_writes)
+
+    key = runtime_main._process_patch_file(patch_path, _clone(sample_world), world_path)
+
+    assert json.loads(patch_path.read_text()) == late_command
+    assert runtime_main._file_key(patch_path) != key
+
+
+def test_watch_inotify_returns_when_watch_is_lost(sample_world, tmp_path, monkeypatch):
+    watched = tmp_path / "gen"
+    watched.mkdir()
+    fd = runtime_main._inotify_init(watched)
+    if fd is None:
+        pytest.skip("inotify is not available")
+    monkeypatch.setattr(runtime_main, "_inotify_add_watch", lambda fd, directory: False)
+    watched.rmdir()
+    try:
+        last_key = runtime_main._watch_inotify(
+            fd, watched / "command.json", _clone(sample_world), tmp_path / "world.json"
+        )
+    finally:
+        os.close(fd)
+
+    assert last_key is None